@@ -1,11 +1,15 @@
 import pandas as pd
+import polars as pl
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-import matplotlib.pyplot as plt
-import seaborn as sns
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from pathlib import Path
-import os
+import shutil
+import urllib.request
 
 ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT / "data"
@@ -19,57 +23,90 @@ def download_data():
     columns = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
                'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'target']
     
-    df = pd.read_csv(url, names=columns, na_values='?')
-    df.to_csv(DATA_DIR / "heart_disease_raw.csv", index=False)
+    raw_path = DATA_DIR / "heart_disease_raw.csv"
+    with urllib.request.urlopen(url) as response, open(raw_path, 'wb') as f:
+        shutil.copyfileobj(response, f)
+    
+    df = pl.read_csv(raw_path, has_header=False, new_columns=columns, null_values='?')
     print(f"✓ Downloaded dataset: {df.shape}")
     return df
 
 def clean_data(df):
-    """Clean and preprocess data"""
-    df = df.dropna()
-    df['target'] = (df['target'] > 0).astype(int)
+    """Clean and preprocess data, returning a pandas DataFrame for EDA/sklearn"""
+    if isinstance(df, pd.DataFrame):
+        df = pl.from_pandas(df)
+    
+    df = df.drop_nulls().with_columns(
+        (pl.col('target') > 0).cast(pl.Int8).alias('target')
+    )
     
     print(f"✓ Cleaned dataset: {df.shape}")
     print(f"✓ Class distribution:\n{df['target'].value_counts()}")
     
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    df.to_csv(DATA_DIR / "heart_disease_clean.csv", index=False)
-    return df
+    df.write_csv(DATA_DIR / "heart_disease_clean.csv")
+    df.write_parquet(DATA_DIR / "heart_disease_clean.parquet", compression='zstd')
+    return df.to_pandas()
 
 def perform_eda(df):
     """Perform exploratory data analysis"""
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     
+    # One figure/canvas is reused for every plot
+    fig = Figure(figsize=(12, 10))
+    FigureCanvasAgg(fig)
+    
     # Correlation heatmap
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(df.corr(), annot=True, fmt='.2f', cmap='coolwarm')
-    plt.title('Feature Correlation Heatmap')
-    plt.tight_layout()
-    plt.savefig(REPORTS_DIR / "correlation_heatmap.png", dpi=300, bbox_inches='tight')
-    plt.close()
+    ax = fig.add_subplot()
+    numeric = df.select_dtypes('number')
+    X = numeric.to_numpy(dtype=np.float32, copy=True)
+    X -= X.mean(axis=0)
+    X /= X.std(axis=0)
+    corr = (X.T @ X) / X.shape[0]
+    im = ax.imshow(corr, cmap='coolwarm', vmin=-1, vmax=1)
+    fig.colorbar(im, ax=ax)
+    ax.set_xticks(range(len(numeric.columns)), labels=numeric.columns, rotation=90)
+    ax.set_yticks(range(len(numeric.columns)), labels=numeric.columns)
+    for i in range(corr.shape[0]):
+        for j in range(corr.shape[1]):
+            ax.text(j, i, f"{corr[i, j]:.2f}", ha='center', va='center')
+    ax.set_title('Feature Correlation Heatmap')
+    fig.tight_layout()
+    fig.savefig(REPORTS_DIR / "correlation_heatmap.png", dpi=100, bbox_inches='tight')
     
     # Distribution plots
-    fig, axes = plt.subplots(3, 3, figsize=(15, 12))
+    fig.clear()
+    fig.set_size_inches(15, 12)
+    axes = fig.subplots(3, 3)
     numeric_cols = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
+    cols_arr = df[numeric_cols].to_numpy()
+    t = df['target'].to_numpy(dtype=bool)
     
     for idx, col in enumerate(numeric_cols):
         row, col_idx = idx // 3, idx % 3
-        sns.histplot(data=df, x=col, hue='target', kde=True, ax=axes[row, col_idx])
-        axes[row, col_idx].set_title(f'{col} Distribution by Target')
+        ax = axes[row, col_idx]
+        edges = np.histogram_bin_edges(cols_arr[:, idx], bins=20)
+        h0, _ = np.histogram(cols_arr[~t, idx], bins=edges)
+        h1, _ = np.histogram(cols_arr[t, idx], bins=edges)
+        width = edges[1] - edges[0]
+        ax.bar(edges[:-1], h0, width=width, align='edge', alpha=0.5, label='0')
+        ax.bar(edges[:-1], h1, width=width, align='edge', alpha=0.5, label='1')
+        ax.legend(title='target')
+        ax.set_title(f'{col} Distribution by Target')
     
-    plt.tight_layout()
-    plt.savefig(REPORTS_DIR / "distributions.png", dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(REPORTS_DIR / "distributions.png", dpi=300, bbox_inches='tight')
     
     # Class balance
-    plt.figure(figsize=(8, 6))
-    df['target'].value_counts().plot(kind='bar', color=['#2ecc71', '#e74c3c'])
-    plt.title('Class Distribution')
-    plt.xlabel('Target (0: No Disease, 1: Disease)')
-    plt.ylabel('Count')
-    plt.xticks(rotation=0)
-    plt.savefig(REPORTS_DIR / "class_balance.png", dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.clear()
+    fig.set_size_inches(8, 6)
+    ax = fig.add_subplot()
+    df['target'].value_counts().plot(kind='bar', color=['#2ecc71', '#e74c3c'], ax=ax)
+    ax.set_title('Class Distribution')
+    ax.set_xlabel('Target (0: No Disease, 1: Disease)')
+    ax.set_ylabel('Count')
+    ax.tick_params(axis='x', rotation=0)
+    fig.savefig(REPORTS_DIR / "class_balance.png", dpi=300, bbox_inches='tight')
     
     print(f"✓ EDA visualizations saved to {REPORTS_DIR}")
 
@@ -1,13 +1,18 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import Depends, FastAPI, HTTPException, Request
+from pydantic import BaseModel
+import msgspec
 import joblib
 import numpy as np
+import onnxruntime as ort
 from prometheus_client import Counter, Histogram, generate_latest
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response
+import itertools
 import time
 import logging
 import os
+import threading
 from pathlib import Path
+from typing import Annotated, List
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,37 +21,74 @@ REQUEST_COUNT = Counter('api_requests_total', 'Total API requests')
 REQUEST_LATENCY = Histogram('api_request_latency_seconds', 'API request latency')
 PREDICTION_COUNTER = Counter('predictions_total', 'Total predictions', ['prediction'])
 
-app = FastAPI(title="Heart Disease Prediction API", version="1.0.0")
+# Bind label children once so the hot path skips the labels() lookup
+PREDICTION_CHILDREN = {p: PREDICTION_COUNTER.labels(prediction=p) for p in (0, 1)}
+
+# Only every Nth request is timed into the latency histogram
+LATENCY_SAMPLE_RATE = 10
+_request_ids = itertools.count()
+
+# Set OPENAPI_URL="" in production to skip schema generation and disable /docs
+app = FastAPI(
+    title="Heart Disease Prediction API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    openapi_url=os.getenv("OPENAPI_URL", "/openapi.json") or None
+)
 
 ROOT = Path(__file__).resolve().parent.parent
 MODELS_DIR = ROOT / "models"
 
 # Load model and scaler
+session, model, scaler = None, None, None
+SCALER_MEAN, SCALER_INV_SCALE = None, None
 try:
     with open(MODELS_DIR / "best_model.txt", 'r') as f:
         best_model_name = f.read().strip()
     
-    model = joblib.load(MODELS_DIR / f"{best_model_name}.pkl")
-    scaler = joblib.load(MODELS_DIR / "scaler.pkl")
-    logger.info(f"✓ Loaded model: {best_model_name}")
+    onnx_path = MODELS_DIR / f"{best_model_name}.onnx"
+    if onnx_path.exists():
+        # The exported graph already includes the scaler
+        sess_options = ort.SessionOptions()
+        sess_options.intra_op_num_threads = 1
+        session = ort.InferenceSession(
+            str(onnx_path), sess_options, providers=['CPUExecutionProvider']
+        )
+        logger.info(f"✓ Loaded ONNX model: {best_model_name}")
+    else:
+        # Memory-map the pickled arrays so pages are faulted in on demand
+        model = joblib.load(MODELS_DIR / f"{best_model_name}.pkl", mmap_mode='r')
+        scaler = joblib.load(MODELS_DIR / "scaler.pkl")
+        SCALER_MEAN = scaler.mean_.astype(np.float32)
+        SCALER_INV_SCALE = (1.0 / scaler.scale_).astype(np.float32)
+        logger.info(f"✓ Loaded model: {best_model_name}")
 except Exception as e:
     logger.error(f"Error loading model: {e}")
-    model, scaler = None, None
-
-class HeartDiseaseInput(BaseModel):
-    age: float = Field(..., ge=0, le=120)
-    sex: int = Field(..., ge=0, le=1)
-    cp: int = Field(..., ge=0, le=3)
-    trestbps: float = Field(..., ge=0, le=300)
-    chol: float = Field(..., ge=0, le=600)
-    fbs: int = Field(..., ge=0, le=1)
-    restecg: int = Field(..., ge=0, le=2)
-    thalach: float = Field(..., ge=0, le=250)
-    exang: int = Field(..., ge=0, le=1)
-    oldpeak: float = Field(..., ge=0, le=10)
-    slope: int = Field(..., ge=0, le=2)
-    ca: int = Field(..., ge=0, le=4)
-    thal: int = Field(..., ge=0, le=3)
+    session, model, scaler, best_model_name = None, None, None, None
+    SCALER_MEAN, SCALER_INV_SCALE = None, None
+
+def predict_proba(features):
+    """Return class probabilities for a float32 (N, 13) feature array (may scale it in place)"""
+    if session is not None:
+        return session.run(["probabilities"], {"X": features})[0]
+    np.subtract(features, SCALER_MEAN, out=features)
+    np.multiply(features, SCALER_INV_SCALE, out=features)
+    return model.predict_proba(features)
+
+class HeartDiseaseInput(msgspec.Struct):
+    age: Annotated[float, msgspec.Meta(ge=0, le=120)]
+    sex: Annotated[int, msgspec.Meta(ge=0, le=1)]
+    cp: Annotated[int, msgspec.Meta(ge=0, le=3)]
+    trestbps: Annotated[float, msgspec.Meta(ge=0, le=300)]
+    chol: Annotated[float, msgspec.Meta(ge=0, le=600)]
+    fbs: Annotated[int, msgspec.Meta(ge=0, le=1)]
+    restecg: Annotated[int, msgspec.Meta(ge=0, le=2)]
+    thalach: Annotated[float, msgspec.Meta(ge=0, le=250)]
+    exang: Annotated[int, msgspec.Meta(ge=0, le=1)]
+    oldpeak: Annotated[float, msgspec.Meta(ge=0, le=10)]
+    slope: Annotated[int, msgspec.Meta(ge=0, le=2)]
+    ca: Annotated[int, msgspec.Meta(ge=0, le=4)]
+    thal: Annotated[int, msgspec.Meta(ge=0, le=3)]
 
 class PredictionResponse(BaseModel):
     prediction: int
@@ -54,56 +96,142 @@ class PredictionResponse(BaseModel):
     risk_level: str
     model_used: str
 
+# Caps the array a single /predict_batch request can make a worker thread allocate
+MAX_BATCH_SIZE = 1000
+
+class BatchInput(msgspec.Struct):
+    items: Annotated[List[HeartDiseaseInput], msgspec.Meta(min_length=1, max_length=MAX_BATCH_SIZE)]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+
+def msgspec_body(struct_type):
+    """Build a dependency that decodes and validates the JSON body in one msgspec pass"""
+    # Lax mode accepts e.g. 1.0 or "63" for numeric fields, as Pydantic did
+    decoder = msgspec.json.Decoder(struct_type, strict=False)
+    
+    async def decode_body(request: Request):
+        try:
+            return decoder.decode(await request.body())
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    
+    return decode_body
+
+def msgspec_request_body(struct_type):
+    """OpenAPI requestBody for a route whose body is decoded by msgspec_body"""
+    schema = msgspec.json.schema(struct_type)
+    defs = schema.pop("$defs", {})
+    
+    # Inline "#/$defs/..." refs, which would not resolve inside the OpenAPI document
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: inline(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v) for v in node]
+        return node
+    
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": inline(schema)}}}}
+
+FEATURE_NAMES = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+                 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+
+# Sync endpoints run in a worker thread pool, so each thread keeps its own buffer
+_buffers = threading.local()
+
+def get_feature_buffer():
+    """Return this thread's preallocated (1, 13) float32 feature array"""
+    if not hasattr(_buffers, 'features'):
+        _buffers.features = np.empty((1, len(FEATURE_NAMES)), dtype=np.float32)
+    return _buffers.features
+
 @app.get("/")
 def root():
     return {"message": "Heart Disease Prediction API", "status": "running"}
 
 @app.get("/health")
 def health_check():
-    if model is None:
+    if session is None and model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     return {"status": "healthy", "model_loaded": True}
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict(input_data: HeartDiseaseInput):
+@app.post("/predict", response_model=PredictionResponse,
+          openapi_extra=msgspec_request_body(HeartDiseaseInput))
+def predict(input_data: HeartDiseaseInput = Depends(msgspec_body(HeartDiseaseInput))):
     start_time = time.time()
+    sample_latency = next(_request_ids) % LATENCY_SAMPLE_RATE == 0
     REQUEST_COUNT.inc()
     
     try:
-        features = np.array([[
-            input_data.age, input_data.sex, input_data.cp,
-            input_data.trestbps, input_data.chol, input_data.fbs,
-            input_data.restecg, input_data.thalach, input_data.exang,
-            input_data.oldpeak, input_data.slope, input_data.ca,
-            input_data.thal
-        ]])
+        features = get_feature_buffer()
+        for i, name in enumerate(FEATURE_NAMES):
+            features[0, i] = getattr(input_data, name)
         
-        features_scaled = scaler.transform(features)
-        
-        prediction = int(model.predict(features_scaled)[0])
-        confidence = float(model.predict_proba(features_scaled)[0][prediction])
+        proba = predict_proba(features)[0]
+        prediction = int(np.argmax(proba))
+        confidence = float(proba[prediction])
         
         risk_level = "High" if prediction == 1 else "Low"
         
-        PREDICTION_COUNTER.labels(prediction=prediction).inc()
-        REQUEST_LATENCY.observe(time.time() - start_time)
+        PREDICTION_CHILDREN[prediction].inc()
+        if sample_latency:
+            REQUEST_LATENCY.observe(time.time() - start_time)
         
         logger.info(f"Prediction: {prediction}, Confidence: {confidence:.2f}")
         
-        with open(MODELS_DIR / "best_model.txt", 'r') as f:
-            model_name = f.read().strip()
-        
         return {
             "prediction": prediction,
             "confidence": confidence,
             "risk_level": risk_level,
-            "model_used": model_name
+            "model_used": best_model_name
         }
         
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict_batch", response_model=BatchPredictionResponse,
+          openapi_extra=msgspec_request_body(BatchInput))
+def predict_batch(batch: BatchInput = Depends(msgspec_body(BatchInput))):
+    start_time = time.time()
+    sample_latency = next(_request_ids) % LATENCY_SAMPLE_RATE == 0
+    REQUEST_COUNT.inc()
+    
+    try:
+        features = np.empty((len(batch.items), len(FEATURE_NAMES)), dtype=np.float32)
+        for i, item in enumerate(batch.items):
+            features[i] = [getattr(item, name) for name in FEATURE_NAMES]
+        
+        proba = predict_proba(features)
+        preds = proba.argmax(axis=1)
+        confs = proba[np.arange(len(preds)), preds]
+        
+        for prediction, count in enumerate(np.bincount(preds, minlength=2).tolist()):
+            if count:
+                PREDICTION_CHILDREN[prediction].inc(count)
+        
+        predictions = []
+        for prediction, confidence in zip(preds.tolist(), confs.tolist()):
+            predictions.append({
+                "prediction": prediction,
+                "confidence": confidence,
+                "risk_level": "High" if prediction == 1 else "Low",
+                "model_used": best_model_name
+            })
+        
+        if sample_latency:
+            REQUEST_LATENCY.observe(time.time() - start_time)
+        
+        logger.info(f"Batch prediction: {len(predictions)} items")
+        
+        return {"predictions": predictions}
+        
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/metrics")
 def metrics():
     return Response(content=generate_latest(), media_type="text/plain")
@@ -3,17 +3,28 @@ import numpy as np
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_auc_score
+from sklearn.pipeline import Pipeline
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
 import mlflow
 import mlflow.sklearn
 import joblib
+from joblib import Parallel, delayed
 from pathlib import Path
-import os
 
 ROOT = Path(__file__).resolve().parent.parent
 MODELS_DIR = ROOT / "models"
-DATA_PATH = ROOT / "data" / "heart_disease_clean.csv"
+DATA_PATH = ROOT / "data" / "heart_disease_clean.parquet"
+TRACKING_URI = (ROOT / "mlruns").as_uri()
+EXPERIMENT_NAME = "heart_disease_prediction"
+
+def load_data():
+    """Load the cleaned dataset, preferring the Parquet copy written by clean_data"""
+    if DATA_PATH.exists():
+        return pd.read_parquet(DATA_PATH)
+    return pd.read_csv(DATA_PATH.with_suffix('.csv'))
 
 def prepare_features(df):
     """Feature engineering and scaling"""
@@ -35,8 +46,9 @@ def prepare_features(df):
 
 def evaluate_model(model, X_test, y_test):
     """Evaluate model and return metrics"""
-    y_pred = model.predict(X_test)
-    y_pred_proba = model.predict_proba(X_test)[:, 1]
+    proba = model.predict_proba(X_test)
+    y_pred_proba = proba[:, 1]
+    y_pred = model.classes_[proba.argmax(axis=1)]
     
     metrics = {
         'accuracy': accuracy_score(y_test, y_pred),
@@ -47,6 +59,18 @@ def evaluate_model(model, X_test, y_test):
     
     return metrics, y_pred
 
+def export_onnx(model, scaler, path):
+    """Export scaler + model as a single ONNX graph for serving"""
+    pipeline = Pipeline([('scaler', scaler), ('model', model)])
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=[('X', FloatTensorType([None, scaler.n_features_in_]))],
+        options={id(model): {'zipmap': False}}
+    )
+    
+    with open(path, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+
 def train_logistic_regression(X_train, X_test, y_train, y_test):
     """Train Logistic Regression with MLflow tracking"""
     with mlflow.start_run(run_name="Logistic_Regression"):
@@ -56,7 +80,7 @@ def train_logistic_regression(X_train, X_test, y_train, y_test):
         model = LogisticRegression(**params)
         model.fit(X_train, y_train)
         
-        cv_scores = cross_val_score(model, X_train, y_train, cv=5)
+        cv_scores = cross_val_score(model, X_train, y_train, cv=5, n_jobs=-1)
         mlflow.log_metric("cv_mean", cv_scores.mean())
         mlflow.log_metric("cv_std", cv_scores.std())
         
@@ -70,22 +94,22 @@ def train_logistic_regression(X_train, X_test, y_train, y_test):
         
         return model, metrics
 
-def train_random_forest(X_train, X_test, y_train, y_test):
-    """Train Random Forest with MLflow tracking"""
-    with mlflow.start_run(run_name="Random_Forest"):
+def train_hist_gradient_boosting(X_train, X_test, y_train, y_test):
+    """Train Histogram Gradient Boosting with MLflow tracking"""
+    with mlflow.start_run(run_name="Hist_Gradient_Boosting"):
         params = {
-            'n_estimators': 100,
-            'max_depth': 10,
-            'min_samples_split': 5,
+            'max_iter': 200,
+            'max_depth': 8,
+            'learning_rate': 0.1,
             'random_state': 42
         }
         
         mlflow.log_params(params)
         
-        model = RandomForestClassifier(**params)
+        model = HistGradientBoostingClassifier(**params)
         model.fit(X_train, y_train)
         
-        cv_scores = cross_val_score(model, X_train, y_train, cv=5)
+        cv_scores = cross_val_score(model, X_train, y_train, cv=5, n_jobs=-1)
         mlflow.log_metric("cv_mean", cv_scores.mean())
         mlflow.log_metric("cv_std", cv_scores.std())
         
@@ -93,27 +117,37 @@ def train_random_forest(X_train, X_test, y_train, y_test):
         mlflow.log_metrics(metrics)
         mlflow.sklearn.log_model(model, "model")
         
-        joblib.dump(model, MODELS_DIR / "random_forest.pkl")
+        joblib.dump(model, MODELS_DIR / "hist_gradient_boosting.pkl")
         
-        print(f"✓ Random Forest - Accuracy: {metrics['accuracy']:.4f}, ROC-AUC: {metrics['roc_auc']:.4f}")
+        print(f"✓ Hist Gradient Boosting - Accuracy: {metrics['accuracy']:.4f}, ROC-AUC: {metrics['roc_auc']:.4f}")
         
         return model, metrics
 
+def run_training(train_fn, X_train, X_test, y_train, y_test):
+    """Run a training function in a worker process with MLflow configured"""
+    mlflow.set_tracking_uri(TRACKING_URI)
+    mlflow.set_experiment(EXPERIMENT_NAME)
+    # cross_val_score's nested n_jobs=-1 runs its folds on joblib's threading backend here
+    return train_fn(X_train, X_test, y_train, y_test)
+
 if __name__ == "__main__":
-    mlflow.set_tracking_uri("file:./mlruns")
-    mlflow.set_experiment("heart_disease_prediction")
+    mlflow.set_tracking_uri(TRACKING_URI)
+    mlflow.set_experiment(EXPERIMENT_NAME)
     
-    df = pd.read_csv(DATA_PATH)
-    
-    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    df = load_data()
     
     X_train, X_test, y_train, y_test, scaler = prepare_features(df)
     
-    lr_model, lr_metrics = train_logistic_regression(X_train, X_test, y_train, y_test)
-    rf_model, rf_metrics = train_random_forest(X_train, X_test, y_train, y_test)
+    (lr_model, lr_metrics), (hgb_model, hgb_metrics) = Parallel(n_jobs=2, backend='loky')(
+        delayed(run_training)(train_fn, X_train, X_test, y_train, y_test)
+        for train_fn in [train_logistic_regression, train_hist_gradient_boosting]
+    )
     
-    best_model_name = 'random_forest' if rf_metrics['roc_auc'] > lr_metrics['roc_auc'] else 'logistic_regression'
+    best_model_name = 'hist_gradient_boosting' if hgb_metrics['roc_auc'] > lr_metrics['roc_auc'] else 'logistic_regression'
     print(f"\n✓ Best model: {best_model_name}")
     
+    export_onnx(lr_model, scaler, MODELS_DIR / "logistic_regression.onnx")
+    export_onnx(hgb_model, scaler, MODELS_DIR / "hist_gradient_boosting.onnx")
+    
     with open(MODELS_DIR / "best_model.txt", 'w') as f:
         f.write(best_model_name)
@@ -0,0 +1,24 @@
+import pytest
+import numpy as np
+import sys
+import os
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+@pytest.fixture(scope='session')
+def client():
+    from src.serve import app
+    return TestClient(app)
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    """Swap the loaded model for a stub that always predicts class 1 at 0.8"""
+    import src.serve as serve
+    model = MagicMock()
+    model.predict_proba.side_effect = lambda X: np.tile([[0.2, 0.8]], (len(X), 1))
+    monkeypatch.setattr(serve, "session", None)
+    monkeypatch.setattr(serve, "model", model)
+    monkeypatch.setattr(serve, "SCALER_MEAN", np.zeros(len(serve.FEATURE_NAMES), dtype=np.float32))
+    monkeypatch.setattr(serve, "SCALER_INV_SCALE", np.ones(len(serve.FEATURE_NAMES), dtype=np.float32))
+    return model
@@ -1,21 +1,15 @@
-from fastapi.testclient import TestClient
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-from src.serve import app
+import pytest
 
-client = TestClient(app)
-
-def test_root():
+def test_root(client):
     response = client.get("/")
     assert response.status_code == 200
     assert "message" in response.json()
 
-def test_health():
+def test_health(client):
     response = client.get("/health")
     assert response.status_code == 200
 
-def test_predict():
+def test_predict(client):
     payload = {
         "age": 63, "sex": 1, "cp": 3, "trestbps": 145,
         "chol": 233, "fbs": 1, "restecg": 0, "thalach": 150,
@@ -24,3 +18,41 @@ def test_predict():
     response = client.post("/predict", json=payload)
     assert response.status_code == 200
     assert "prediction" in response.json()
+
+def test_predict_invalid(client):
+    payload = {
+        "age": 150, "sex": 1, "cp": 3, "trestbps": 145,
+        "chol": 233, "fbs": 1, "restecg": 0, "thalach": 150,
+        "exang": 0, "oldpeak": 2.3, "slope": 0, "ca": 0, "thal": 1
+    }
+    response = client.post("/predict", json=payload)
+    assert response.status_code == 422
+
+def test_openapi_request_bodies(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    for path in ["/predict", "/predict_batch"]:
+        schema = paths[path]["post"]["requestBody"]["content"]["application/json"]["schema"]
+        assert "properties" in schema
+
+def test_predict_batch(client, stub_model):
+    payload = {
+        "age": 63, "sex": 1, "cp": 3, "trestbps": 145,
+        "chol": 233, "fbs": 1, "restecg": 0, "thalach": 150,
+        "exang": 0, "oldpeak": 2.3, "slope": 0, "ca": 0, "thal": 1
+    }
+    response = client.post("/predict_batch", json={"items": [payload, payload]})
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert len(predictions) == 2
+    assert predictions[0]["prediction"] == 1
+    assert predictions[0]["confidence"] == pytest.approx(0.8)
+    stub_model.predict_proba.assert_called_once()
+
+def test_predict_batch_too_large(client):
+    payload = {
+        "age": 63, "sex": 1, "cp": 3, "trestbps": 145,
+        "chol": 233, "fbs": 1, "restecg": 0, "thalach": 150,
+        "exang": 0, "oldpeak": 2.3, "slope": 0, "ca": 0, "thal": 1
+    }
+    response = client.post("/predict_batch", json={"items": [payload] * 1001})
+    assert response.status_code == 422
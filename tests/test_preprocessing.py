@@ -3,9 +3,11 @@ import pandas as pd
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import src.data_preprocessing as data_preprocessing
 from src.data_preprocessing import clean_data
 
-def test_clean_data():
+def test_clean_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_preprocessing, "DATA_DIR", tmp_path)
     df = pd.DataFrame({
         'age': [50, 60, 70],
         'sex': [1, 0, 1],
@@ -26,3 +28,4 @@ def test_clean_data():
     cleaned = clean_data(df.copy())
     assert cleaned['target'].max() == 1
     assert cleaned['target'].min() == 0
+    assert (tmp_path / "heart_disease_clean.parquet").exists()
@@ -0,0 +1,32 @@
+import pytest
+import numpy as np
+import onnxruntime as ort
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import HistGradientBoostingClassifier
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from src.train import export_onnx
+
+@pytest.mark.parametrize("model", [
+    LogisticRegression(max_iter=1000, random_state=42),
+    HistGradientBoostingClassifier(max_iter=20, random_state=42),
+])
+def test_export_onnx_matches_sklearn(model, tmp_path):
+    rng = np.random.default_rng(42)
+    X = rng.normal(50, 20, size=(200, 13)).astype(np.float32)
+    y = (X[:, 0] + X[:, 3] > 100).astype(int)
+    
+    scaler = StandardScaler().fit(X)
+    model.fit(scaler.transform(X), y)
+    
+    path = tmp_path / "model.onnx"
+    export_onnx(model, scaler, path)
+    
+    session = ort.InferenceSession(str(path), providers=['CPUExecutionProvider'])
+    onnx_proba = session.run(["probabilities"], {"X": X})[0]
+    sklearn_proba = model.predict_proba(scaler.transform(X))
+    
+    np.testing.assert_allclose(onnx_proba, sklearn_proba, atol=1e-4)
+    assert (onnx_proba.argmax(axis=1) == sklearn_proba.argmax(axis=1)).all()